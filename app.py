@@ -2,11 +2,12 @@ import streamlit as st
 import os
 import json
 import time 
+from dotenv import load_dotenv
 
-# 기존에 만든 모듈들을 가져옵니다.
-from app.utils.pdf_parser2 import load_and_split_pdf
-from app.utils.vector_store import create_vector_db
-from app.chain.rag_engine import JEDECBot
+from app.utils.db_paths import get_db_name
+
+# .env의 OPENAI_API_KEY 로드 (무거운 모듈들은 lazy import 하므로 여기서 직접 호출)
+load_dotenv()
 
 # --- 설정 ---
 st.set_page_config(page_title="JEDEC Specs Navigator", page_icon="💾", layout="wide")
@@ -42,7 +43,10 @@ st.markdown("""
 
 
 # --- 유틸리티 함수 ---
+@st.cache_data(ttl=30)
 def get_file_structure(root_dir):
+    # 채팅 입력마다 스크립트가 재실행되므로 폴더 스캔 결과를 잠시 캐시합니다.
+    # (폴더에 직접 넣은 PDF도 최대 30초 안에 반영, 업로드 시에는 즉시 초기화)
     structure = {}
     if not os.path.exists(root_dir):
         return {}
@@ -61,6 +65,24 @@ def get_file_structure(root_dir):
             
     return structure
 
+def train_document(pdf_path, db_path):
+    # PDF 파싱 → 벡터DB 생성 → 캐시 초기화 (라이브러리/업로드 탭 공통)
+    # 학습 성공 시 True, DB가 만들어지지 않았으면(API 키 없음 등) False 반환
+
+    # 파서/벡터DB 모듈은 pdfplumber·langchain·chromadb를 끌어오므로 무겁습니다.
+    # 실제로 사용하는 시점에 import 하여, 프로세스의 첫 화면에서 학습된 문서가
+    # 선택되지 않은 경우(문서 없음/미학습 문서)에는 이 로딩을 건너뜁니다.
+    # (한 번 import 되면 이후 rerun에서는 sys.modules를 재사용하므로 비용 없음)
+    from app.utils.pdf_parser2 import load_and_split_pdf
+    from app.utils.vector_store import create_vector_db
+
+    chunks = load_and_split_pdf(pdf_path)
+    if create_vector_db(chunks, db_path) is None:
+        return False
+    st.cache_resource.clear()
+    get_file_structure.clear()
+    return True
+
 # --- 메타데이터 로드 함수 ---
 def load_doc_metadata(db_path):
     meta_path = os.path.join(db_path, "doc_info.json")
@@ -99,28 +121,27 @@ with st.sidebar:
                 files = sorted(file_struct[selected_category])
                 selected_file = st.selectbox("문서 선택", files)
                 
-                # 경로 계산
+                # 경로 계산 (Uncategorized = data/pdfs 루트)
                 if selected_category == "Uncategorized":
+                    rel_dir = "."
                     real_pdf_path = os.path.join(PRELOAD_DIR, selected_file)
-                    db_name = f"Root_{os.path.splitext(selected_file)[0]}_db"
                 else:
+                    rel_dir = selected_category
                     real_pdf_path = os.path.join(PRELOAD_DIR, selected_category, selected_file)
-                    clean_cat = selected_category.replace(os.sep, "_")
-                    db_name = f"{clean_cat}_{os.path.splitext(selected_file)[0]}_db"
                 
-                target_db_path = os.path.join(DB_ROOT, db_name)
+                target_db_path = os.path.join(DB_ROOT, get_db_name(rel_dir, selected_file))
                 
                 # 상태 확인 및 버튼 표시
                 if not os.path.exists(target_db_path):
                     st.info("⚠️ 아직 학습되지 않은 문서입니다.")
                     if st.button(f"🚀 '{selected_file}' 학습 시작", key="train_btn"):
                         with st.spinner("AI가 문서를 읽고 있습니다..."):
-                            chunks = load_and_split_pdf(real_pdf_path)
-                            create_vector_db(chunks, target_db_path)
-                            st.cache_resource.clear()
-                            st.success("학습 완료!")
-                            time.sleep(0.5)
-                            st.rerun()
+                            if train_document(real_pdf_path, target_db_path):
+                                st.success("학습 완료!")
+                                time.sleep(0.5)
+                                st.rerun()
+                            else:
+                                st.error("학습 실패: OPENAI_API_KEY가 설정되어 있는지 확인해주세요.")
                 else:
                     st.success("✅ 준비 완료")
                     selected_db_path = target_db_path
@@ -139,18 +160,14 @@ with st.sidebar:
                     with open(save_path, "wb") as f:
                         f.write(uploaded_file.getbuffer())
                     
-                    # 2. DB 바로 생성
-                    db_name = f"User_Uploads_{os.path.splitext(uploaded_file.name)[0]}_db"
-                    target_db_path = os.path.join(DB_ROOT, db_name)
-                    
-                    chunks = load_and_split_pdf(save_path)
-                    create_vector_db(chunks, target_db_path)
-                    
-                    # 3. 리프레시
-                    st.cache_resource.clear()
-                    st.success(f"'{uploaded_file.name}' 등록 완료!")
-                    time.sleep(1)
-                    st.rerun()
+                    # 2. DB 바로 생성 및 리프레시
+                    target_db_path = os.path.join(DB_ROOT, get_db_name("User_Uploads", uploaded_file.name))
+                    if train_document(save_path, target_db_path):
+                        st.success(f"'{uploaded_file.name}' 등록 완료!")
+                        time.sleep(1)
+                        st.rerun()
+                    else:
+                        st.error("학습 실패: OPENAI_API_KEY가 설정되어 있는지 확인해주세요.")
 
     st.markdown("---")
     st.caption(f"Total Cached DBs: {len(os.listdir(DB_ROOT)) if os.path.exists(DB_ROOT) else 0}")
@@ -158,6 +175,8 @@ with st.sidebar:
 # --- 메인 로직 ---
 @st.cache_resource
 def get_bot(db_path):
+    # RAG 엔진도 학습된 문서를 선택했을 때만 import (train_document 주석 참고)
+    from app.chain.rag_engine import JEDECBot
     return JEDECBot(db_path)
 
 st.header("🔍 JEDEC Standard Q&A")
@@ -207,21 +226,16 @@ if selected_db_path and os.path.exists(selected_db_path):
             st.markdown(msg["content"])
 
     # 사용자 입력 처리 (버튼 클릭 or 직접 입력)
-    prompt = None
-    if clicked_q:
-        prompt = clicked_q # 버튼 클릭 시
-    elif input_text := st.chat_input("질문 입력..."):
-        prompt = input_text # 직접 입력 시
+    # 입력창은 버튼 클릭 시에도 항상 그려두고, 버튼 질문을 우선합니다.
+    input_text = st.chat_input("질문 입력...")
+    prompt = clicked_q or input_text
 
     if prompt:
+        # 메시지 append 후 같은 실행 흐름에서 바로 아래 답변 로직을 탑니다.
+        # (st.rerun()으로 한 번 더 전체 스크립트를 돌릴 필요 없음)
         st.session_state.messages.append({"role": "user", "content": prompt})
-        
-        # (중요) 버튼 클릭 시 화면 갱신을 위해 rerun이 필요할 수 있지만, 
-        # Streamlit 흐름상 메시지 append 후 아래 로직을 타게 함.
-        if clicked_q:
-             st.rerun() # 버튼 클릭 효과를 즉시 반영하기 위해 리프레시
 
-    # 마지막 메시지가 유저라면 답변 생성 (버튼 클릭 후 리런되면 이리로 옴)
+    # 마지막 메시지가 유저라면 답변 생성
     if st.session_state.messages[-1]["role"] == "user":
         last_prompt = st.session_state.messages[-1]["content"]
         
@@ -233,10 +247,9 @@ if selected_db_path and os.path.exists(selected_db_path):
             full_res = ""
             with st.spinner("답변 생성 중..."):
                 try:
-                    resp = bot.ask(last_prompt)
-                    for chunk in resp.split():
-                        full_res += chunk + " "
-                        time.sleep(0.02)
+                    # LLM이 생성하는 토큰을 그대로 받아 화면에 갱신
+                    for chunk in bot.stream(last_prompt):
+                        full_res += chunk
                         ph.markdown(full_res + "▌")
                     ph.markdown(full_res)
                 except Exception as e:
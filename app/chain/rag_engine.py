@@ -1,27 +1,59 @@
 import os 
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from dotenv import load_dotenv
 
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import ChatOpenAI
 from langchain_chroma import Chroma
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 
+from app.utils.vector_store import get_query_embeddings
+
 load_dotenv()
 
 # 벡터 DB가 저장 경로 
 PERSIST_DIRECTORY = "./chroma_db"
 
+# 동일 질문 답변 캐시 크기 (문서별 봇 인스턴스마다)
+ANSWER_CACHE_SIZE = 128
+
+# 질문 응답 프롬프트. 고정된 문자열이므로 인스턴스마다 파싱하지 않고 한 번만 생성
+QA_PROMPT = ChatPromptTemplate.from_template(
+    """
+    당신은 반도체 JEDEC 표준 문서 전문가입니다. 
+    아래의 [Context]를 바탕으로 사용자의 질문에 답변하세요. 
+
+    규칙:
+    1. 반드시 제공된 [Context] 내용에 기반해서만 답변하세요. 
+    2. [Context]에 없는 내용이라면, "문서에서 관련 내용을 찾을 수 없습니다." 라고 솔직하게 말하세요. 
+    3. 답변 끝에 참조한 정보가 포함된 페이지 정보가 있다면 언급해주세요. (Context 메타데이터 활용)
+
+    [Context]: {context}
+    [Question] : {question}
+    [Answer]: 
+    """
+)
+
+@lru_cache(maxsize=None)
+def get_llm():
+    """
+    문서별 JEDECBot 인스턴스들이 공유하는 LLM 클라이언트
+    """
+    return ChatOpenAI(model_name = "gpt-5-nano", temperature=0)
+
 class JEDECBot:
     def __init__(self, db_path):
         """
         챗봇 엔진 초기화 : LLM, 임베딩, 벡터DB, 프롬프트 설정
         """
-        #1. 모델 설정
-        self.llm = ChatOpenAI(model_name = "gpt-5-nano", temperature=0)
+        #1. 모델 설정 (문서를 바꿔도 클라이언트는 재사용)
+        self.llm = get_llm()
 
-        #2. 임베딩 모델 설정 
-        self.embedding = OpenAIEmbeddings(model="text-embedding-")
+        #2. 임베딩 모델 설정 (학습 시와 동일한 모델, 질문 임베딩은 캐시)
+        self.embedding = get_query_embeddings()
 
         #3. 벡터 DB 로드 
         if not os.path.exists(db_path):
@@ -34,25 +66,18 @@ class JEDECBot:
         )
 
         #4. 검색기 설정. k=3으로 설정하여 가장 유사한 문서 조각 3개를 가져오기로 함 
-        self.retriever = self.vector_store.as_retriever(search_kwags={"k":3})
-
-        #5. 프롬프트 템플릿 설정 
-        self.prompt = ChatPromptTemplate.from_template(
-            """
-            당신은 반도체 JEDEC 표준 문서 전문가입니다. 
-            아래의 [Context]를 바탕으로 사용자의 질문에 답변하세요. 
-
-            규칙:
-            1. 반드시 제공된 [Context] 내용에 기반해서만 답변하세요. 
-            2. [Context]에 없는 내용이라면, "문서에서 관련 내용을 찾을 수 없습니다." 라고 솔직하게 말하세요. 
-            3. 답변 끝에 참조한 정보가 포함된 페이지 정보가 있다면 언급해주세요. (Context 메타데이터 활용)
-
-            [Context]: {context}
-            [Question] : {question}
-            [Answer]: 
-            """
+        # (청크 최대 1200자 x 3 으로 프롬프트에 들어가는 Context 크기가 제한됨)
+        # 인접 청크는 300자(1200자 중 1/4)씩 겹치므로, 후보 12개 중 MMR로 3개를 고릅니다.
+        # 단, 표가 두 청크에 걸쳐 잘린 경우 이어지는 청크도 필요하므로
+        # lambda_mult를 0.75로 두어 다양성보다 관련도를 우선합니다. (기본값 0.5)
+        self.retriever = self.vector_store.as_retriever(
+            search_type="mmr",
+            search_kwargs={"k":3, "fetch_k":12, "lambda_mult":0.75}
         )
 
+        #5. 프롬프트 템플릿 설정 (모듈 로드 시 한 번만 파싱된 템플릿 공유)
+        self.prompt = QA_PROMPT
+
         #6. chain 구성 (LCEL 방식). 문서 포맷팅 -> 프롬프트 주입 -> LLM 생성 -> 문자열 파싱 
         self.chain = (
             {
@@ -64,22 +89,59 @@ class JEDECBot:
             | StrOutputParser()
         )
 
+        #7. 답변 캐시. 추천 질문 버튼처럼 같은 질문이 반복되면 검색+LLM 호출을 생략
+        self._answer_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
     def _format_docs(self, docs):
         """
         검색된 문서들을 하나의 텍스트로 합치고, 출처(page)를 남기는 함수 
         """
-        formatted_text = ""
+        parts = []
         for doc in docs:
             page = doc.metadata.get('page', 'Unknown')
             source = doc.metadata.get('source', 'Unknown File')
-            formatted_text += f"\n--- [Page {page} of {source}] --- \n{doc.page_content}\n"
-        return formatted_text
+            parts.append(f"\n--- [Page {page} of {source}] --- \n{doc.page_content}\n")
+        return "".join(parts)
     
+    def _cache_key(self, query):
+        """
+        앞뒤/중복 공백만 다른 질문은 같은 질문으로 취급
+        (대소문자는 의미가 다르므로 구분: 8Gb vs 8GB, tCK vs TCK)
+        """
+        return " ".join(query.split())
+
+    def stream(self, query: str):
+        """
+        사용자 질문을 받아 답변을 생성되는 대로 조각(str) 단위로 yield 하는 함수
+        """
+        key = self._cache_key(query)
+        with self._cache_lock:
+            cached = self._answer_cache.get(key)
+            if cached is not None:
+                self._answer_cache.move_to_end(key)
+
+        # lock을 잡은 채로 yield 하지 않도록 밖에서 반환
+        if cached is not None:
+            yield cached
+            return
+
+        pieces = []
+        for piece in self.chain.stream(query):
+            pieces.append(piece)
+            yield piece
+
+        # 끝까지 생성된 답변만 캐시에 저장
+        with self._cache_lock:
+            self._answer_cache[key] = "".join(pieces)
+            if len(self._answer_cache) > ANSWER_CACHE_SIZE:
+                self._answer_cache.popitem(last=False)
+
     def ask(self, query: str):
         """
         사용자 질문을 받아 답변을 반환하는 함수 
         """
-        return self.chain.invoke(query)
+        return "".join(self.stream(query))
 
 # 테스트 실행 코드 
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+import os
+
+def get_db_name(rel_dir, filename):
+    """
+    PDF 파일에 대응하는 벡터 DB 폴더 이름을 만드는 함수 (app.py / bulk_ingest.py 공통 규칙)
+
+    Args:
+        rel_dir (str) : data/pdfs 기준 상대 폴더 경로 (루트에 있으면 ".")
+        filename (str) : PDF 파일 이름
+    Returns:
+        str: DB 폴더 이름 (예: DRAM_JESD79-5_DDR5_db)
+    """
+    stem = os.path.splitext(filename)[0]
+    if rel_dir == ".":
+        return f"Root_{stem}_db"
+    return f"{rel_dir.replace(os.sep, '_')}_{stem}_db"
@@ -1,7 +1,17 @@
+import os
 import pdfplumber
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
+# Chunking (문맥 유지를 위해 오버랩을 조금 더 늘림)
+# 설정이 고정이므로 호출마다 만들지 않고 모듈 로드 시 한 번만 생성합니다.
+TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=1200,    # 표가 포함되면 글자수가 많아지므로 약간 늘림
+    chunk_overlap=300, 
+    length_function=len,
+    is_separator_regex=False,
+)
+
 def load_and_split_pdf(file_path):
     """
     pdfplumber를 사용하여 텍스트 레이아웃을 보존하며 파싱합니다.
@@ -24,17 +34,10 @@ def load_and_split_pdf(file_path):
                     metadata={"source": file_path, "page": i + 1}
                 ))
     
-    print(f"Loaded {len(docs)} pages.")
-
-    # Chunking (문맥 유지를 위해 오버랩을 조금 더 늘림)
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1200,    # 표가 포함되면 글자수가 많아지므로 약간 늘림
-        chunk_overlap=300, 
-        length_function=len,
-        is_separator_regex=False,
-    )
+    name = os.path.basename(file_path)
+    print(f"[{name}] Loaded {len(docs)} pages.")
 
-    chunks = text_splitter.split_documents(docs)
-    print(f"Split into {len(chunks)} chunks.")
+    chunks = TEXT_SPLITTER.split_documents(docs)
+    print(f"[{name}] Split into {len(chunks)} chunks.")
     
     return chunks
\ No newline at end of file
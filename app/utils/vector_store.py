@@ -1,48 +1,107 @@
 import os 
+import re
+import hashlib
 import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_chroma import Chroma
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.embeddings import Embeddings
 
-def generate_jedec_summary(chunks):
+# 학습/검색 모두 같은 임베딩 모델을 써야 벡터 공간이 일치합니다.
+EMBEDDING_MODEL = "text-embedding-3-large"
+
+# 질문 임베딩 캐시 크기 (문서가 달라도 같은 질문이면 재사용)
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# 한 번에 임베딩/삽입할 chunk 수 (OpenAI 요청당 토큰 한도와 메모리 사용량을 고려)
+INSERT_BATCH_SIZE = 250
+
+# LLM 응답을 감싸는 마크다운 코드펜스(```json ... ``` 또는 ``` ... ```) 제거용
+JSON_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# 문서 요약/추천 질문 추출 프롬프트 (고정 문자열이므로 모듈 로드 시 한 번만 생성)
+SUMMARY_PROMPT = ChatPromptTemplate.from_template(
+    """
+    당신은 반도체 JEDEC 표준 분석가입니다.
+    아래 제공된 문서의 앞부분을 읽고 다음 정보를 JSON 형식으로 추출하세요.
+    
+    1. title: 문서의 공식 제목 (예: DDR5 SDRAM)
+    2. revision: 리비전 정보 (찾을 수 없다면 'Unknown' 표시)
+    3. key_params: 이 표준에서 가장 중요한 기술적 파라미터 3~5개 나열 (문자열 리스트)
+    4. recommended_questions: 실무 엔지니어가 이 문서에 대해 물어볼 만한 핵심 질문 3개 (한국어)
+    
+    [Document Text Preview]:
+    {text}
+    
+    Output JSON:
+    """
+)
+
+@lru_cache(maxsize=None)
+def get_embeddings():
+    """
+    프로세스 전체에서 공유하는 임베딩 클라이언트 (HTTP 커넥션 풀 재사용)
+    """
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL)
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    질문(embed_query) 임베딩 결과를 LRU로 캐시하는 래퍼
+    문서 임베딩(embed_documents)은 캐시 없이 그대로 위임합니다.
+    """
+    def __init__(self, embeddings, maxsize=QUERY_EMBEDDING_CACHE_SIZE):
+        self.embeddings = embeddings
+        self._embed_query = lru_cache(maxsize=maxsize)(self._embed_query_uncached)
+
+    def _embed_query_uncached(self, text):
+        # 캐시된 값이 호출자에 의해 수정되지 않도록 tuple로 보관
+        return tuple(self.embeddings.embed_query(text))
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        # 앞뒤/중복 공백만 다른 질문은 같은 키로 취급
+        return list(self._embed_query(" ".join(text.split())))
+
+
+@lru_cache(maxsize=None)
+def get_query_embeddings():
+    """
+    검색(챗봇) 용도로 공유하는 질문 임베딩 캐시 클라이언트
+    """
+    return CachedQueryEmbeddings(get_embeddings())
+
+
+@lru_cache(maxsize=None)
+def get_summary_llm():
+    """
+    문서 요약(doc_info.json 생성)에 공유하는 LLM 클라이언트 (HTTP 커넥션 풀 재사용)
+    """
+    return ChatOpenAI(model_name="gpt-4o-mini", temperature=0)
+
+
+def generate_jedec_summary(chunks, label=""):
     """
     문서의 앞부분(초록/목차)을 읽고 JEDEC 문서의 핵심 정보를 추출합니다.
     """
     # 문서의 앞쪽 5개 청크만 사용하여 요약 (전체를 다 읽으면 돈이 많이 드니까요)
     sample_text = "\n".join([chunk.page_content for chunk in chunks[:5]])
     
-    llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0)
-    
-    prompt = ChatPromptTemplate.from_template(
-        """
-        당신은 반도체 JEDEC 표준 분석가입니다.
-        아래 제공된 문서의 앞부분을 읽고 다음 정보를 JSON 형식으로 추출하세요.
-        
-        1. title: 문서의 공식 제목 (예: DDR5 SDRAM)
-        2. revision: 리비전 정보 (찾을 수 없다면 'Unknown' 표시)
-        3. key_params: 이 표준에서 가장 중요한 기술적 파라미터 3~5개 나열 (문자열 리스트)
-        4. recommended_questions: 실무 엔지니어가 이 문서에 대해 물어볼 만한 핵심 질문 3개 (한국어)
-        
-        [Document Text Preview]:
-        {text}
-        
-        Output JSON:
-        """
-    )
-    
     try:
-        chain = prompt | llm
+        chain = SUMMARY_PROMPT | get_summary_llm()
         response = chain.invoke({"text": sample_text})
         
         # JSON 파싱 (가끔 마크다운 ```json ... ``` 이 포함될 수 있어 제거 처리)
-        content = response.content.strip()
-        if content.startswith("```json"):
-            content = content.replace("```json", "").replace("```", "")
+        content = JSON_FENCE_PATTERN.sub("", response.content.strip())
         
         return json.loads(content)
     except Exception as e:
-        print(f"Summary Generation Failed: {e}")
+        print(f"[{label}] Summary Generation Failed: {e}")
         return {
             "title": "JEDEC Standard", 
             "revision": "Unknown", 
@@ -51,6 +110,51 @@ def generate_jedec_summary(chunks):
         }
     
 
+def chunk_id(chunk):
+    """
+    chunk 내용으로 결정되는 ID (같은 내용이면 항상 같은 ID)
+    """
+    return hashlib.blake2b(chunk.page_content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def dedupe_chunks(chunks):
+    """
+    내용이 완전히 같은 chunk(반복되는 머리글/저작권 고지/목차 등)는 첫 번째 것만 남기는 함수
+    ID 계산을 한 번만 하도록 (id, chunk) 쌍의 리스트로 반환합니다.
+    """
+    seen = set()
+    unique_pairs = []
+    for chunk in chunks:
+        key = chunk_id(chunk)
+        if key not in seen:
+            seen.add(key)
+            unique_pairs.append((key, chunk))
+    return unique_pairs
+
+
+def add_documents_in_batches(vectordb, chunks, batch_size=INSERT_BATCH_SIZE, label=""):
+    """
+    chunk들을 중복 제거 후 batch_size 단위로 나눠 벡터 DB에 추가하는 함수
+    배치마다 임베딩 API 1회 호출 + Chroma 삽입 1회로 처리됩니다.
+    (ID가 내용 기반이므로 같은 배치에 중복 ID가 들어가지 않도록 여기서 중복 제거)
+    Returns:
+        int: 실제로 삽입한 chunk 수 (중복 제거 후)
+    """
+    pairs = dedupe_chunks(chunks)
+    if len(pairs) < len(chunks):
+        print(f"[{label}] Skipped {len(chunks) - len(pairs)} duplicate chunks.")
+
+    for start in range(0, len(pairs), batch_size):
+        batch = pairs[start:start + batch_size]
+        vectordb.add_documents(
+            [chunk for _, chunk in batch],
+            ids=[key for key, _ in batch],
+        )
+        print(f"[{label}] Embedded {start + len(batch)}/{len(pairs)} chunks")
+
+    return len(pairs)
+
+
 def create_vector_db(chunks, persist_directory):
     """
     텍스트 chunk list를 받아서 벡터 DB를 생성하고 로컬에 저장하는 함수 
@@ -61,7 +165,10 @@ def create_vector_db(chunks, persist_directory):
         return None
     
     #0. OpenAI 임베딩 모델 사용 
-    embeddings = OpenAIEmbeddings(model = 'text-embedding-3-large')
+    embeddings = get_embeddings()
+
+    # 여러 문서를 동시에 학습할 때(bulk_ingest) 로그를 구분하기 위한 DB 이름
+    label = os.path.basename(persist_directory)
 
 
     #1. 기존 DB가 있다면 충돌 방지를 위해 삭제 
@@ -69,16 +176,21 @@ def create_vector_db(chunks, persist_directory):
         shutil.rmtree(persist_directory)
         print(f"warnning: '{persist_directory}' 폴더가 이미 존재하여 삭제 후 재생성합니다.")
 
-    #2. ChromaDB 생성 및 데이터 삽입 
-    vectordb = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        persist_directory=persist_directory,
-    ) 
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # 2. [추가된 기능] 문서 요약 및 추천 질문 생성
+        # 임베딩과 서로 독립적인 LLM 호출이므로 백그라운드에서 동시에 진행
+        print(f"[{label}] Generating Document Metadata (Summary & FAQs)...")
+        summary_future = executor.submit(generate_jedec_summary, chunks, label)
+
+        #2. ChromaDB 생성 및 데이터 삽입 
+        # 전체를 한 번에 넣지 않고 배치 단위로 임베딩 → 삽입
+        vectordb = Chroma(
+            embedding_function=embeddings,
+            persist_directory=persist_directory,
+        )
+        stored = add_documents_in_batches(vectordb, chunks, label=label)
 
-    # 2. [추가된 기능] 문서 요약 및 추천 질문 생성
-    print("Generating Document Metadata (Summary & FAQs)...")
-    metadata = generate_jedec_summary(chunks)
+        metadata = summary_future.result()
     
     # 3. 메타데이터를 JSON 파일로 DB 폴더 안에 저장
     meta_path = os.path.join(persist_directory, "doc_info.json")
@@ -86,7 +198,7 @@ def create_vector_db(chunks, persist_directory):
         json.dump(metadata, f, ensure_ascii=False, indent=2)
 
     #3. 저장 (자동 저장되므로 메시지만 표시)
-    print(f"Finished! Vector DB created with {len(chunks)} chunks.")
+    print(f"[{label}] Finished! Vector DB created with {stored} chunks.")
     return vectordb
 
     
@@ -99,7 +211,7 @@ def load_vector_db(persist_directory):
         print("저장된 벡터DB가 없습니다. 먼저 create_vector_db를 실행하세요.")
         return None
     
-    embeddings = OpenAIEmbeddings(model = "text_embedding_3_small")
+    embeddings = get_query_embeddings()
     vectordb = Chroma(
         persist_directory= persist_directory,
         embedding_function= embeddings,
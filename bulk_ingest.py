@@ -1,7 +1,10 @@
 import os
 import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from app.utils.pdf_parser2 import load_and_split_pdf
 from app.utils.vector_store import create_vector_db
+from app.utils.db_paths import get_db_name
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -11,6 +14,24 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PRELOAD_DIR = os.path.join(BASE_DIR, "data", "pdfs")
 DB_ROOT = os.path.join(BASE_DIR, "chroma_dbs")
 
+# 동시에 학습할 문서 수 (임베딩/요약 API 대기 시간을 겹치기 위함)
+# 문서마다 create_vector_db가 요약 생성용 스레드를 하나 더 띄우므로,
+# 실제 동시 OpenAI 호출 주체는 최대 MAX_WORKERS x 2 (기본 8개)입니다.
+# API rate limit에 걸리면 이 값을 줄이세요.
+MAX_WORKERS = 4
+
+def ingest_one(pdf_path, db_path):
+    # 파싱 및 DB 생성
+    try:
+        chunks = load_and_split_pdf(pdf_path)
+        if create_vector_db(chunks, db_path) is None:
+            raise RuntimeError("벡터 DB가 생성되지 않았습니다 (OPENAI_API_KEY 확인)")
+    except Exception:
+        # 중간에 실패하면 반쯤 만들어진 DB 폴더가 남아 다음 실행에서 '이미 학습됨'으로
+        # 건너뛰게 되므로, 지워서 재실행 시 다시 학습되도록 합니다.
+        shutil.rmtree(db_path, ignore_errors=True)
+        raise
+
 def ingest_all():
     print(f"📂 데이터 폴더 스캔 중: {PRELOAD_DIR}")
     
@@ -23,34 +44,32 @@ def ingest_all():
         for filename in filenames:
             if filename.lower().endswith(".pdf"):
                 pdf_path = os.path.join(dirpath, filename)
-                
-                # DB 경로 생성 규칙 (app.py와 동일하게)
-                if category == ".":
-                    db_name = f"Root_{os.path.splitext(filename)[0]}_db"
-                else:
-                    clean_cat = category.replace(os.sep, "_")
-                    db_name = f"{clean_cat}_{os.path.splitext(filename)[0]}_db"
-                
-                db_path = os.path.join(DB_ROOT, db_name)
+                db_path = os.path.join(DB_ROOT, get_db_name(category, filename))
                 tasks.append((pdf_path, db_path, filename))
 
     print(f"총 {len(tasks)}개의 PDF 파일을 찾았습니다.\n")
 
-    # 순차적으로 학습 진행
-    for i, (pdf_path, db_path, filename) in enumerate(tasks):
-        print(f"[{i+1}/{len(tasks)}] 처리 중: {filename} ...")
-        
+    # 이미 학습된 문서는 건너뜀
+    pending = []
+    for pdf_path, db_path, filename in tasks:
         if os.path.exists(db_path):
-            print(f"  👉 이미 학습됨 (건너뜀)")
-            continue
-            
-        try:
-            # 파싱 및 DB 생성
-            chunks = load_and_split_pdf(pdf_path)
-            create_vector_db(chunks, db_path)
-            print(f"  ✅ 학습 완료!")
-        except Exception as e:
-            print(f"  ❌ 실패: {e}")
+            print(f"  👉 이미 학습됨 (건너뜀): {filename}")
+        else:
+            pending.append((pdf_path, db_path, filename))
+
+    # 문서 단위로 병렬 학습 진행 (대부분의 시간이 OpenAI API 대기)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(ingest_one, pdf_path, db_path): filename
+            for pdf_path, db_path, filename in pending
+        }
+        for i, future in enumerate(as_completed(futures)):
+            filename = futures[future]
+            try:
+                future.result()
+                print(f"[{i+1}/{len(pending)}] ✅ 학습 완료: {filename}")
+            except Exception as e:
+                print(f"[{i+1}/{len(pending)}] ❌ 실패: {filename} ({e})")
 
     print("\n🎉 모든 작업이 완료되었습니다! 이제 앱을 실행하세요.")
 